@@ -31,11 +31,14 @@ class ActionType(Enum):
     SPECIAL = "special"
 
 
-@dataclass
+@dataclass(frozen=True)
 class KeyMapping:
     """
     Represents a mapping between an IR code and a keyboard action.
 
+    Frozen only to prevent attribute reassignment: list-valued keys stay
+    mutable, and hashing such a mapping raises TypeError.
+
     Attributes:
         action_type (ActionType): Type of action to perform
         keys (list[str] | str): Key(s) to execute
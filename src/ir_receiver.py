@@ -8,8 +8,42 @@ reading IR codes and providing them to the key mapper for processing.
 import serial
 import time
 import threading
+from collections import deque
 from typing import Optional, Callable
-from queue import Queue, Empty
+from queue import Empty
+
+CODE_QUEUE_SIZE = 100
+
+# Firmware lines that carry no IR code, checked on raw bytes before decoding
+CONTROL_LINES = frozenset({b"READY", b"RST"})
+STATUS_PREFIXES = (b"OK:",)
+
+
+class _CodeQueueView:
+    """
+    Queue-style view over the receiver's code deque.
+    Keeps the old code_queue API (put_nowait/get_nowait/empty/qsize) working.
+    """
+
+    def __init__(self, receiver: "IRReceiver"):
+        self._receiver = receiver
+        self._codes = receiver._codes
+
+    def put_nowait(self, code: str):
+        self._receiver._enqueue(code)
+
+    def get_nowait(self) -> str:
+        try:
+            return self._codes.popleft()
+        except IndexError:
+            raise Empty
+
+    def empty(self) -> bool:
+        return not self._codes
+
+    def qsize(self) -> int:
+        return len(self._codes)
+
 
 class IRReceiver:
     """
@@ -22,23 +56,28 @@ class IRReceiver:
         self.baud_rate = baud_rate
         self.serial_connection: Optional[serial.Serial] = None
         self.receiving = False
-        self.code_queue = Queue(maxsize=100)
+        # Single producer (receiver thread) / single consumer (get_code):
+        # deque append/popleft are atomic, and maxlen drops the oldest code.
+        self._codes = deque(maxlen=CODE_QUEUE_SIZE)
+        self._new_code = threading.Event()
         self.receiver_thread: Optional[threading.Thread] = None
-        self.error_callback: Optional[Callable[[str], None]] = None
+        self.error_callback: Callable[[str], None] = print
         
         self.codes_received = 0
         self.codes_dropped = 0
         
-    def set_error_callback(self, callback: Callable[[str], None]):
-        """Set error callback function."""
-        self.error_callback = callback
+    @property
+    def code_queue(self) -> _CodeQueueView:
+        """Queue-style access to pending codes."""
+        return _CodeQueueView(self)
+    
+    def set_error_callback(self, callback: Optional[Callable[[str], None]]):
+        """Set error callback function; None restores the default print."""
+        self.error_callback = callback if callback is not None else print
     
     def _log_error(self, message: str):
-        """Log error using callback or print."""
-        if self.error_callback:
-            self.error_callback(f"[IR Receiver] {message}")
-        else:
-            print(f"[IR Receiver Error] {message}")
+        """Log error through the error callback (print by default)."""
+        self.error_callback(f"[IR Receiver] {message}")
     
     def connect(self) -> bool:
         """Establish serial connection with optimized settings."""
@@ -78,30 +117,40 @@ class IRReceiver:
         Optimized receiver loop for simple hex format.
         Expects lines like: 0xHEXVALUE
         """
-        buffer = bytearray()
+        buffer = b""
         
         while self.receiving and self.serial_connection:
             try:
                 if self.serial_connection.in_waiting:
                     chunk = self.serial_connection.read(self.serial_connection.in_waiting)
-                    buffer.extend(chunk)
-                    
-                    while b'\n' in buffer:
-                        line_end = buffer.index(b'\n')
-                        line = bytes(buffer[:line_end]).strip()
-                        buffer = buffer[line_end + 1:]
-                        
-                        if line.endswith(b'\r'):
-                            line = line[:-1]
-                        
-                        if line:
-                            self._process_line(line)
+                    buffer = self._consume_chunk(buffer, chunk)
                 else:
                     time.sleep(0.0001)
                     
             except Exception as e:
                 pass
     
+    def _consume_chunk(self, buffer: bytes, chunk: bytes) -> bytes:
+        """
+        Split buffered serial data into lines and process each complete one.
+        
+        Args:
+            buffer: Partial line left over from the previous read
+            chunk: Newly read bytes
+            
+        Returns:
+            The trailing partial line to carry into the next read
+        """
+        lines = (buffer + chunk).split(b'\n')
+        remainder = lines.pop()
+        
+        for line in lines:
+            line = line.strip()
+            if line:
+                self._process_line(line)
+        
+        return remainder
+    
     def _process_line(self, line: bytes):
         """
         Process a single line from Arduino.
@@ -112,27 +161,24 @@ class IRReceiver:
         - RST (reset confirmation)
         - REPEAT (optional repeat signal)
         """
+        if line in CONTROL_LINES or line.startswith(STATUS_PREFIXES):
+            return
+        
         try:
             decoded = line.decode('ascii').strip()
-            if decoded.startswith('0x') or decoded == "REPEAT":
-                self.codes_received += 1
-                try:
-                    self.code_queue.put_nowait(decoded)
-                except:
-                    self.codes_dropped += 1
-                    try:
-                        self.code_queue.get_nowait()
-                        self.code_queue.put_nowait(decoded)
-                    except:
-                        pass
-
-            elif decoded.startswith("OK:"):
-                pass
-            elif decoded in ["READY", "RST"]:
-                pass
-            
         except UnicodeDecodeError:
-            pass
+            return
+        
+        if decoded.startswith('0x') or decoded == "REPEAT":
+            self.codes_received += 1
+            self._enqueue(decoded)
+    
+    def _enqueue(self, code: str):
+        """Append a code, counting the oldest one as dropped when the queue is full."""
+        if len(self._codes) == CODE_QUEUE_SIZE:
+            self.codes_dropped += 1
+        self._codes.append(code)
+        self._new_code.set()
     
     def start_receiving(self) -> bool:
         """Start receiving with high-priority thread."""
@@ -176,20 +222,33 @@ class IRReceiver:
         Returns:
             IR code string like "0x8D722287" or None
         """
+        codes = self._codes
         try:
+            return codes.popleft()
+        except IndexError:
             if timeout == 0:
-                return self.code_queue.get_nowait()
-            else:
-                return self.code_queue.get(timeout=timeout)
-        except Empty:
-            return None
+                return None
+        
+        # Clear then re-check so a code appended in between is not missed
+        self._new_code.clear()
+        try:
+            return codes.popleft()
+        except IndexError:
+            pass
+        
+        if self._new_code.wait(timeout):
+            try:
+                return codes.popleft()
+            except IndexError:
+                pass
+        return None
     
     def get_statistics(self) -> dict:
         """Get receiver statistics."""
         return {
             "codes_received": self.codes_received,
             "codes_dropped": self.codes_dropped,
-            "queue_size": self.code_queue.qsize(),
+            "queue_size": len(self._codes),
             "connected": self.is_connected(),
             "receiving": self.receiving
         }
@@ -208,6 +267,10 @@ class IRReceiver:
     
     def disconnect(self):
         """Clean disconnect."""
+        if self.serial_connection is None and not self.receiving:
+            self._codes.clear()
+            return
+        
         self.flush_buffer()
         self.stop_receiving()
         
@@ -223,8 +286,4 @@ class IRReceiver:
         if self.is_connected():
             self.serial_connection.reset_input_buffer()
         
-        while not self.code_queue.empty():
-            try:
-                self.code_queue.get_nowait()
-            except Empty:
-                break
\ No newline at end of file
+        self._codes.clear()
\ No newline at end of file
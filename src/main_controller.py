@@ -32,9 +32,9 @@ class IRRemoteController:
         current_profile (Optional[RemoteProfile]): Currently loaded remote profile
     """
 
-    def __init__(self, port="COM4", profile_path=None):
+    def __init__(self, port="COM4", profile_path=None, config_manager=None):
         self.receiver = IRReceiver(port=port)
-        self.config_manager = ConfigManager("config")
+        self.config_manager = config_manager if config_manager is not None else ConfigManager("config")
         self.mapper = KeyMapper()
         self.running = False
         
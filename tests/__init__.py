@@ -1,3 +0,0 @@
-"""
-Test package for IR Remote Controller application.
-"""
\ No newline at end of file
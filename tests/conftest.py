@@ -4,24 +4,40 @@ Fixed for src/ directory structure.
 """
 
 import pytest
+import os
 import sys
 import tempfile
 import shutil
 from pathlib import Path
+from types import ModuleType, SimpleNamespace
 from unittest.mock import Mock
 
 # Add the src directory to Python path
 project_root = Path(__file__).parent.parent
 src_dir = project_root / "src"
-sys.path.insert(0, str(src_dir))
+if str(src_dir) not in sys.path:
+    sys.path.insert(0, str(src_dir))
 
-# Verify imports work
+# Stub the keyboard module before key_mapper pulls in the real one, which
+# probes input devices / installs OS hooks on import. These no-ops are also
+# what disable_keyboard_hooks puts in place of a real keyboard module's calls;
+# tests that care about key presses patch over them or use kb_recorder.
+_KEYBOARD_NOOPS = {
+    "press": lambda *args, **kwargs: None,
+    "release": lambda *args, **kwargs: None,
+    "press_and_release": lambda *args, **kwargs: None,
+    "unhook_all": lambda: None,
+}
+_keyboard_stub = ModuleType("keyboard")
+for _name, _noop in _KEYBOARD_NOOPS.items():
+    setattr(_keyboard_stub, _name, _noop)
+sys.modules.setdefault("keyboard", _keyboard_stub)
+
+# Verify imports work. Only config_manager is needed by the fixtures here;
+# cli/ir_receiver/key_mapper/main_controller are imported by the test modules
+# (or their fixtures) that use them, so selecting a subset skips the rest.
 try:
     from config_manager import ConfigManager, RemoteProfile, KeyMapping, ActionType
-    import cli
-    import ir_receiver
-    import key_mapper
-    import main_controller
     print(f"✓ Successfully imported modules from {src_dir}")
 except ImportError as e:
     print(f"✗ Failed to import modules: {e}")
@@ -30,10 +46,15 @@ except ImportError as e:
     print(f"✓ Available source files: {list(src_dir.glob('*.py'))}")
 
 
+# Prefer a RAM-backed tmpfs for config files so profile saves skip disk syncs
+_shm_dir = Path("/dev/shm")
+TEMP_ROOT = str(_shm_dir) if _shm_dir.is_dir() and os.access(_shm_dir, os.W_OK) else None
+
+
 @pytest.fixture
 def temp_config_dir():
-    """Create a temporary configuration directory."""
-    temp_dir = tempfile.mkdtemp()
+    """Create a temporary configuration directory (on /dev/shm when available)."""
+    temp_dir = tempfile.mkdtemp(dir=TEMP_ROOT)
     yield temp_dir
     shutil.rmtree(temp_dir, ignore_errors=True)
 
@@ -138,18 +159,65 @@ def mock_controller(mock_ir_receiver, mock_key_mapper, config_manager):
     return controller
 
 
+@pytest.fixture
+def fake_time(monkeypatch):
+    """Install a frozen clock (time Mock + no-op sleep) on a module; returns the fake."""
+    def install(module, now=0.0):
+        fake = SimpleNamespace(time=Mock(return_value=now), sleep=Mock())
+        monkeypatch.setattr(module, "time", fake)
+        return fake
+    return install
+
+
+@pytest.fixture(scope="session")
+def controller_class():
+    """IRRemoteController, imported on first use; skips if main_controller won't import."""
+    return pytest.importorskip("main_controller").IRRemoteController
+
+
 @pytest.fixture(autouse=True)
 def disable_keyboard_hooks():
-    """Disable actual keyboard hooks during testing."""
-    # Mock keyboard module if it's imported
-    try:
-        import keyboard
-        keyboard.press = Mock()
-        keyboard.release = Mock()
-        keyboard.press_and_release = Mock()
-        keyboard.unhook_all = Mock()
-    except ImportError:
-        pass  # keyboard module not available, which is fine for testing
+    """Disable actual keyboard hooks during testing, restoring them afterwards."""
+    keyboard = sys.modules["keyboard"]
+    if keyboard is _keyboard_stub:
+        yield
+        return
+    originals = {name: getattr(keyboard, name) for name in _KEYBOARD_NOOPS}
+    for name, noop in _KEYBOARD_NOOPS.items():
+        setattr(keyboard, name, noop)
+    yield
+    for name, original in originals.items():
+        setattr(keyboard, name, original)
+
+
+class KBRecorder:
+    """Lightweight stand-in for the keyboard module that records calls in plain lists."""
+
+    def __init__(self):
+        self.calls = []
+        self.press = []
+        self.release = []
+        self.press_and_release = []
+
+    def _record(self, name):
+        keys = getattr(self, name)
+
+        def record(key, *args, **kwargs):
+            keys.append(key)
+            self.calls.append((name, key))
+
+        return record
+
+
+@pytest.fixture
+def kb_recorder(monkeypatch):
+    """Route keyboard press/release calls into a KBRecorder."""
+    import keyboard
+    recorder = KBRecorder()
+    for name in ("press", "release", "press_and_release"):
+        monkeypatch.setattr(keyboard, name, recorder._record(name))
+    monkeypatch.setattr(keyboard, "unhook_all", lambda: None)
+    return recorder
 
 
 @pytest.fixture
@@ -197,6 +265,15 @@ def pytest_configure(config):
     config.addinivalue_line(
         "markers", "unit: mark test as unit test"
     )
+    config.addinivalue_line(
+        "markers", "controller_integration: controller integration tests, deselected by default"
+    )
+    config.addinivalue_line(
+        "markers", "isolated: test needs its own fresh instance instead of a shared one"
+    )
+    config.addinivalue_line(
+        "markers", "xdist_group(name): keep tests on one pytest-xdist worker (--dist loadgroup)"
+    )
 
 
 def pytest_collection_modifyitems(config, items):
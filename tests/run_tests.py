@@ -67,7 +67,7 @@ def run_tests(args):
     
     # Add parallel execution
     if args.parallel:
-        cmd.extend(["-n", "auto"])
+        cmd.extend(["-n", "auto", "--dist", "loadgroup"])
     
     # Add output format
     if args.html_report:
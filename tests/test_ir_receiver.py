@@ -3,392 +3,480 @@ Test suite for ir_receiver module.
 """
 
 import pytest
-import time
+import serial
 import threading
-from unittest.mock import Mock, MagicMock, patch
-from queue import Queue, Empty
-
-from ir_receiver import IRReceiver
-
-
-class TestIRReceiver:
-    """Test IRReceiver class."""
-    
-    def setup_method(self):
-        """Set up test environment."""
-        from ir_receiver import IRReceiver
-        self.receiver = IRReceiver(port="TEST_PORT", baud_rate=9600)
-    
-    def teardown_method(self):
-        """Clean up test environment."""
-        if hasattr(self, 'receiver') and self.receiver:
-            self.receiver.disconnect()
-    
-    def test_init(self):
-        """Test IRReceiver initialization."""
-        assert self.receiver.port == "TEST_PORT"
-        assert self.receiver.baud_rate == 9600
-        assert self.receiver.serial_connection is None
-        assert self.receiver.receiving is False
-        assert not self.receiver.code_queue.empty() or self.receiver.code_queue.empty()  # Queue exists
-        assert self.receiver.receiver_thread is None
-        assert self.receiver.codes_received == 0
-        assert self.receiver.codes_dropped == 0
-    
-    def test_set_error_callback(self):
-        """Test setting error callback."""
-        callback = Mock()
-        self.receiver.set_error_callback(callback)
-        assert self.receiver.error_callback == callback
-    
-    def test_log_error_with_callback(self):
-        """Test logging error with callback."""
-        callback = Mock()
-        self.receiver.set_error_callback(callback)
-        self.receiver._log_error("Test error")
-        callback.assert_called_once_with("[IR Receiver] Test error")
-    
-    def test_log_error_without_callback(self):
-        """Test logging error without callback."""
-        with patch('builtins.print') as mock_print:
-            self.receiver._log_error("Test error")
-            mock_print.assert_called_once_with("[IR Receiver Error] Test error")
-    
-    @patch('serial.Serial')
-    def test_connect_success(self, mock_serial):
-        """Test successful connection."""
-        mock_connection = MagicMock()
-        mock_connection.in_waiting = False
-        mock_serial.return_value = mock_connection
-        
-        result = self.receiver.connect()
-        assert result is True
-        assert self.receiver.serial_connection == mock_connection
-        
-        # Verify serial configuration
-        mock_serial.assert_called_once_with(
-            port="TEST_PORT",
-            baudrate=9600,
-            timeout=0,
-            write_timeout=0,
-            inter_byte_timeout=None,
-            rtscts=False,
-            dsrdtr=False,
-        )
-    
-    @patch('serial.Serial')
-    def test_connect_with_ready_signal(self, mock_serial):
-        """Test connection with READY signal from Arduino."""
-        mock_connection = MagicMock()
-        mock_connection.in_waiting = True
-        mock_connection.readline.return_value = b"READY\n"
-        mock_serial.return_value = mock_connection
-        
-        result = self.receiver.connect()
-        assert result is True
-    
-    @patch('serial.Serial')
-    def test_connect_failure(self, mock_serial):
-        """Test connection failure."""
-        mock_serial.side_effect = Exception("Connection failed")
-        
-        result = self.receiver.connect()
-        assert result is False
-        assert self.receiver.serial_connection is None
-    
-    def test_process_line_ir_code(self):
-        """Test processing IR code line."""
-        self.receiver._process_line(b"0x8D722287")
-        
-        assert self.receiver.codes_received == 1
-        assert not self.receiver.code_queue.empty()
-        code = self.receiver.code_queue.get_nowait()
-        assert code == "0x8D722287"
-    
-    def test_process_line_repeat(self):
-        """Test processing REPEAT signal."""
-        self.receiver._process_line(b"REPEAT")
-        
-        assert self.receiver.codes_received == 1
-        assert not self.receiver.code_queue.empty()
-        code = self.receiver.code_queue.get_nowait()
-        assert code == "REPEAT"
-    
-    def test_process_line_status_response(self):
-        """Test processing status response."""
-        self.receiver._process_line(b"OK:8D722287")
-        # Should not add to queue or increment counter
-        assert self.receiver.codes_received == 0
-        assert self.receiver.code_queue.empty()
-    
-    def test_process_line_ready_signal(self):
-        """Test processing READY signal."""
-        self.receiver._process_line(b"READY")
-        # Should not add to queue or increment counter
-        assert self.receiver.codes_received == 0
-        assert self.receiver.code_queue.empty()
-    
-    def test_process_line_reset_signal(self):
-        """Test processing RST signal."""
-        self.receiver._process_line(b"RST")
-        # Should not add to queue or increment counter
-        assert self.receiver.codes_received == 0
-        assert self.receiver.code_queue.empty()
-    
-    def test_process_line_invalid_unicode(self):
-        """Test processing line with invalid unicode."""
-        # Should not raise exception
-        self.receiver._process_line(b'\xff\xfe\x00')
-        assert self.receiver.codes_received == 0
-    
-    def test_process_line_queue_full(self):
-        """Test processing line when queue is full."""
-        # Fill the queue to maxsize
-        for i in range(100):  # maxsize is 100
-            self.receiver.code_queue.put_nowait(f"0x{i}")
-        
-        # This should drop the oldest and add the new one
-        self.receiver._process_line(b"0xNEW")
-        
-        assert self.receiver.codes_received == 1
-        assert self.receiver.codes_dropped == 1
-    
-    def test_start_receiving_no_connection(self):
-        """Test starting receiver without connection."""
-        result = self.receiver.start_receiving()
-        assert result is False
-    
-    @patch('serial.Serial')
-    def test_start_receiving_success(self, mock_serial):
-        """Test starting receiver successfully."""
-        mock_connection = MagicMock()
-        mock_serial.return_value = mock_connection
-        self.receiver.connect()
-        
-        result = self.receiver.start_receiving()
-        assert result is True
-        assert self.receiver.receiving is True
-        assert self.receiver.receiver_thread is not None
-        assert self.receiver.receiver_thread.is_alive()
-        
-        # Clean up
-        self.receiver.stop_receiving()
-    
-    @patch('serial.Serial')
-    def test_start_receiving_already_receiving(self, mock_serial):
-        """Test starting receiver when already receiving."""
-        mock_connection = MagicMock()
-        mock_serial.return_value = mock_connection
-        self.receiver.connect()
-        
-        # Start once
-        result1 = self.receiver.start_receiving()
-        assert result1 is True
-        
-        # Start again
-        result2 = self.receiver.start_receiving()
-        assert result2 is True
-        
-        # Clean up
-        self.receiver.stop_receiving()
-    
-    @patch('serial.Serial')
-    def test_stop_receiving(self, mock_serial):
-        """Test stopping receiver."""
-        mock_connection = MagicMock()
-        mock_serial.return_value = mock_connection
-        self.receiver.connect()
-        self.receiver.start_receiving()
-        
-        # Stop receiving
-        self.receiver.stop_receiving()
-        assert self.receiver.receiving is False
-    
-    def test_stop_receiving_not_started(self):
-        """Test stopping receiver that wasn't started."""
-        # Should not raise exception
-        self.receiver.stop_receiving()
-        assert self.receiver.receiving is False
-    
-    def test_get_code_immediate(self):
-        """Test getting code immediately."""
-        self.receiver.code_queue.put_nowait("0x123")
-        code = self.receiver.get_code(timeout=0)
-        assert code == "0x123"
-    
-    def test_get_code_empty_queue(self):
-        """Test getting code from empty queue."""
-        code = self.receiver.get_code(timeout=0)
-        assert code is None
-    
-    def test_get_code_with_timeout(self):
-        """Test getting code with timeout."""
-        # This should timeout and return None
-        start_time = time.time()
-        code = self.receiver.get_code(timeout=0.1)
-        elapsed = time.time() - start_time
-        
-        assert code is None
-        assert elapsed >= 0.1
-    
-    def test_get_statistics(self):
-        """Test getting receiver statistics."""
-        self.receiver.codes_received = 5
-        self.receiver.codes_dropped = 2
-        self.receiver.code_queue.put_nowait("0x123")
-        
-        stats = self.receiver.get_statistics()
-        
-        assert stats["codes_received"] == 5
-        assert stats["codes_dropped"] == 2
-        assert stats["queue_size"] == 1
-        assert stats["connected"] is False  # Not connected in test
-        assert stats["receiving"] is False
-    
-    @patch('serial.Serial')
-    def test_send_command(self, mock_serial):
-        """Test sending command to Arduino."""
-        mock_connection = MagicMock()
-        mock_serial.return_value = mock_connection
-        self.receiver.connect()
-        
-        self.receiver.send_command("S")
-        mock_connection.write.assert_called_once_with(b"S")
-    
-    def test_send_command_not_connected(self):
-        """Test sending command when not connected."""
-        # Should not raise exception
-        self.receiver.send_command("S")
-    
-    @patch('serial.Serial')
-    def test_send_command_exception(self, mock_serial):
-        """Test sending command with exception."""
-        mock_connection = MagicMock()
-        mock_connection.write.side_effect = Exception("Write failed")
-        mock_serial.return_value = mock_connection
-        self.receiver.connect()
-        
-        # Should not raise exception
-        self.receiver.send_command("S")
-    
-    def test_is_connected_false(self):
-        """Test is_connected when not connected."""
-        assert self.receiver.is_connected() is False
-    
-    @patch('serial.Serial')
-    def test_is_connected_true(self, mock_serial):
-        """Test is_connected when connected."""
-        mock_connection = MagicMock()
-        mock_connection.is_open = True
-        mock_serial.return_value = mock_connection
-        self.receiver.connect()
-        
-        assert self.receiver.is_connected() is True
-    
-    @patch('serial.Serial')
-    def test_disconnect(self, mock_serial):
-        """Test disconnection."""
-        mock_connection = MagicMock()
-        mock_serial.return_value = mock_connection
-        self.receiver.connect()
-        self.receiver.start_receiving()
-        
-        self.receiver.disconnect()
-        
-        assert self.receiver.receiving is False
-        assert self.receiver.serial_connection is None
-        mock_connection.close.assert_called_once()
-    
-    def test_disconnect_not_connected(self):
-        """Test disconnection when not connected."""
-        # Should not raise exception
-        self.receiver.disconnect()
-    
-    @patch('serial.Serial')
-    def test_disconnect_close_exception(self, mock_serial):
-        """Test disconnection with close exception."""
-        mock_connection = MagicMock()
-        mock_connection.close.side_effect = Exception("Close failed")
-        mock_serial.return_value = mock_connection
-        self.receiver.connect()
-        
-        # Should not raise exception
-        self.receiver.disconnect()
-        assert self.receiver.serial_connection is None
-    
-    @patch('serial.Serial')
-    def test_flush_buffer(self, mock_serial):
-        """Test buffer flushing."""
-        mock_connection = MagicMock()
-        mock_serial.return_value = mock_connection
-        self.receiver.connect()
-        
-        # Add some items to queue
-        self.receiver.code_queue.put_nowait("0x1")
-        self.receiver.code_queue.put_nowait("0x2")
-        
-        self.receiver.flush_buffer()
-        
-        assert self.receiver.code_queue.empty()
-        mock_connection.reset_input_buffer.assert_called_once()
-    
-    def test_flush_buffer_not_connected(self):
-        """Test buffer flushing when not connected."""
-        # Add some items to queue
-        self.receiver.code_queue.put_nowait("0x1")
-        self.receiver.code_queue.put_nowait("0x2")
-        
-        self.receiver.flush_buffer()
-        
-        # Queue should still be cleared
-        assert self.receiver.code_queue.empty()
-    
-    def test_receiver_loop_with_timeout_fixed(self):
-        """Test receiver loop doesn't hang."""
-        # Mock serial connection
-        mock_connection = Mock()
-        mock_connection.in_waiting = False
-        self.receiver.serial_connection = mock_connection
-        
-        # Start receiving with a very short timeout
-        self.receiver.receiving = True
-        
-        import threading
-        import time
-        
-        # Start receiver in separate thread with timeout
-        thread = threading.Thread(target=self.receiver._receiver_loop, daemon=True)
-        thread.start()
-        
-        # Let it run briefly then stop
-        time.sleep(0.1)
-        self.receiver.receiving = False
-        
-        # Wait for thread to finish with timeout
-        thread.join(timeout=1.0)
-        
-        # Thread should have stopped
-        assert not thread.is_alive()
-    
-    @patch('serial.Serial')
-    def test_receiver_loop_integration(self, mock_serial):
-        """Test receiver loop with mock data."""
-        mock_connection = MagicMock()
-        mock_connection.in_waiting = True
-        mock_connection.read.return_value = b"0x123\n0x456\nREPEAT\n"
-        mock_serial.return_value = mock_connection
-        
-        self.receiver.connect()
-        self.receiver.start_receiving()
-        
-        # Give some time for processing
-        time.sleep(0.1)
-        
-        # Stop and check results
-        self.receiver.stop_receiving()
-        
-        # Should have processed the codes
-        assert self.receiver.codes_received >= 2  # At least 0x123 and 0x456
+from itertools import chain, repeat
+from unittest.mock import Mock, MagicMock, PropertyMock
+
+import ir_receiver
+from ir_receiver import IRReceiver, CODE_QUEUE_SIZE
+
+# Keep this module on one worker under `pytest -n auto --dist loadgroup`
+pytestmark = pytest.mark.xdist_group("ir_receiver")
+
+# Enough codes to fill the receiver queue, built once per process
+FULL_QUEUE_CODES = tuple(f"0x{i}" for i in range(CODE_QUEUE_SIZE))
+
+
+@pytest.fixture
+def serial_mock():
+    """Connection mock specced on serial.Serial, returned by the patched constructor."""
+    mock = MagicMock(spec=serial.Serial)
+    mock.is_open = True  # instance attribute, so not part of the class spec
+    return mock
+
+
+@pytest.fixture
+def error_callback():
+    """Callback mock for the receiver's error reporting."""
+    return Mock()
+
+
+@pytest.fixture(scope="module")
+def _template_receiver():
+    """One receiver shared by tests that don't need a fresh object."""
+    return IRReceiver(port="TEST_PORT", baud_rate=9600)
+
+
+@pytest.fixture(autouse=True)
+def mock_serial(monkeypatch, serial_mock):
+    """Replace serial.Serial for every test; the constructor returns serial_mock."""
+    constructor = MagicMock(return_value=serial_mock)
+    monkeypatch.setattr('serial.Serial', constructor)
+    return constructor
+
+
+@pytest.fixture
+def receiver(request, _template_receiver):
+    """Receiver under test, reset from the shared template unless marked isolated."""
+    if request.node.get_closest_marker("isolated"):
+        receiver = IRReceiver(port="TEST_PORT", baud_rate=9600)
+    else:
+        receiver = _template_receiver
+        receiver.serial_connection = None
+        receiver.receiving = False
+        receiver.receiver_thread = None
+        receiver.error_callback = print
+        receiver.codes_received = 0
+        receiver.codes_dropped = 0
+        receiver._codes.clear()
+        receiver._new_code.clear()
+    
+    yield receiver
+    
+    if receiver.serial_connection is not None or receiver.receiver_thread is not None:
+        receiver.disconnect()
+
+
+@pytest.mark.isolated
+def test_init(receiver):
+    """Test IRReceiver initialization."""
+    assert receiver.port == "TEST_PORT"
+    assert receiver.baud_rate == 9600
+    assert receiver.serial_connection is None
+    assert receiver.receiving is False
+    assert not receiver.code_queue.empty() or receiver.code_queue.empty()  # Queue exists
+    assert receiver.receiver_thread is None
+    assert receiver.codes_received == 0
+    assert receiver.codes_dropped == 0
+
+
+def test_set_error_callback(receiver, error_callback):
+    """Test setting error callback."""
+    receiver.set_error_callback(error_callback)
+    assert receiver.error_callback == error_callback
+
+
+def test_log_error_with_callback(receiver, error_callback):
+    """Test logging error with callback."""
+    receiver.set_error_callback(error_callback)
+    receiver._log_error("Test error")
+    error_callback.assert_called_once_with("[IR Receiver] Test error")
+
+
+def test_set_error_callback_none_falls_back_to_print(receiver, error_callback, capsys):
+    """Test clearing the error callback restores print instead of breaking _log_error."""
+    receiver.set_error_callback(error_callback)
+    receiver.set_error_callback(None)
+    assert receiver.error_callback is print
+    receiver._log_error("Test error")
+    assert capsys.readouterr().out == "[IR Receiver] Test error\n"
+
+
+def test_log_error_without_callback(receiver, capsys):
+    """Test logging error with the default print callback."""
+    assert receiver.error_callback is print
+    receiver._log_error("Test error")
+    assert capsys.readouterr().out == "[IR Receiver] Test error\n"
+
+
+@pytest.mark.isolated
+def test_connect_success(receiver, mock_serial, serial_mock):
+    """Test successful connection."""
+    serial_mock.in_waiting = False
+    
+    result = receiver.connect()
+    assert result is True
+    assert receiver.serial_connection == serial_mock
+    
+    # Verify serial configuration
+    mock_serial.assert_called_once_with(
+        port="TEST_PORT",
+        baudrate=9600,
+        timeout=0,
+        write_timeout=0,
+        inter_byte_timeout=None,
+        rtscts=False,
+        dsrdtr=False,
+    )
+
+
+@pytest.mark.isolated
+def test_connect_with_ready_signal(receiver, serial_mock):
+    """Test connection with READY signal from Arduino."""
+    serial_mock.in_waiting = True
+    serial_mock.readline.return_value = b"READY\n"
+    
+    result = receiver.connect()
+    assert result is True
+
+
+@pytest.mark.isolated
+def test_connect_failure(receiver, mock_serial):
+    """Test connection failure."""
+    mock_serial.side_effect = Exception("Connection failed")
+    
+    result = receiver.connect()
+    assert result is False
+    assert receiver.serial_connection is None
+
+
+@pytest.mark.parametrize("line,expect_code,expect_count", [
+    (b"0x8D722287", "0x8D722287", 1),
+    (b"REPEAT", "REPEAT", 1),
+    (b"OK:8D722287", None, 0),
+    (b"READY", None, 0),
+    (b"RST", None, 0),
+    (b"\xff\xfe\x00", None, 0),
+], ids=["ir_code", "repeat", "status_response", "ready_signal", "reset_signal", "invalid_unicode"])
+def test_process_line(receiver, line, expect_code, expect_count):
+    """Test which serial lines are queued as codes."""
+    receiver._process_line(line)
+    
+    assert receiver.codes_received == expect_count
+    if expect_code is not None:
+        assert receiver.code_queue.get_nowait() == expect_code
+    else:
+        assert receiver.code_queue.empty()
+
+
+def test_process_line_queue_full(receiver):
+    """Test processing line when queue is full."""
+    # Fill the queue to maxsize in one bulk extend
+    receiver._codes.extend(FULL_QUEUE_CODES)
+    
+    # This should drop the oldest and add the new one
+    receiver._process_line(b"0xNEW")
+    
+    assert receiver.codes_received == 1
+    assert receiver.codes_dropped == 1
+    assert receiver.code_queue.qsize() == CODE_QUEUE_SIZE
+    assert receiver.get_code() == "0x1"  # "0x0" was dropped
+
+
+def test_code_queue_put_nowait_full(receiver):
+    """Test that put_nowait on a full queue counts the dropped code."""
+    receiver._codes.extend(FULL_QUEUE_CODES)
+    
+    receiver.code_queue.put_nowait("0xNEW")
+    
+    assert receiver.codes_dropped == 1
+    assert receiver.code_queue.qsize() == CODE_QUEUE_SIZE
+    assert receiver.get_code() == "0x1"  # "0x0" was dropped
+
+
+def test_start_receiving_no_connection(receiver):
+    """Test starting receiver without connection."""
+    result = receiver.start_receiving()
+    assert result is False
+
+
+@pytest.mark.timeout(0.2)
+@pytest.mark.isolated
+def test_start_receiving_success(receiver, serial_mock):
+    """Test starting receiver successfully."""
+    serial_mock.in_waiting = 0
+    receiver.serial_connection = serial_mock
+    
+    result = receiver.start_receiving()
+    assert result is True
+    assert receiver.receiving is True
+    assert receiver.receiver_thread is not None
+    assert receiver.receiver_thread.is_alive()
+    
+    # Clean up
+    receiver.stop_receiving()
+
+
+@pytest.mark.isolated
+def test_start_receiving_already_receiving(receiver):
+    """Test starting receiver when already receiving."""
+    receiver.connect()
+    
+    # Start once
+    result1 = receiver.start_receiving()
+    assert result1 is True
+    
+    # Start again
+    result2 = receiver.start_receiving()
+    assert result2 is True
+    
+    # Clean up
+    receiver.stop_receiving()
+
+
+@pytest.mark.timeout(0.2)
+@pytest.mark.isolated
+def test_stop_receiving(receiver, serial_mock):
+    """Test stopping receiver."""
+    serial_mock.in_waiting = 0
+    receiver.serial_connection = serial_mock
+    receiver.start_receiving()
+    
+    # Stop receiving
+    receiver.stop_receiving()
+    assert receiver.receiving is False
+
+
+def test_stop_receiving_not_started(receiver):
+    """Test stopping receiver that wasn't started."""
+    # Should not raise exception
+    receiver.stop_receiving()
+    assert receiver.receiving is False
+
+
+def test_get_code_immediate(receiver):
+    """Test getting code immediately."""
+    receiver.code_queue.put_nowait("0x123")
+    code = receiver.get_code(timeout=0)
+    assert code == "0x123"
+
+
+def test_get_code_empty_queue(receiver):
+    """Test getting code from empty queue."""
+    code = receiver.get_code(timeout=0)
+    assert code is None
+
+
+def test_get_code_with_timeout(receiver, monkeypatch):
+    """Test getting code with timeout."""
+    # Record the requested wait instead of actually blocking
+    waits = []
+    monkeypatch.setattr(receiver._new_code, "wait",
+                        lambda timeout=None: waits.append(timeout) or False)
+    
+    code = receiver.get_code(timeout=0.1)
+    
+    assert code is None
+    assert waits == [0.1]
+
+
+def test_get_code_wakes_on_new_code(receiver):
+    """Test that a waiting get_code returns as soon as a code arrives."""
+    timer = threading.Timer(0.01, receiver._process_line, args=(b"0xABC",))
+    timer.start()
+    
+    code = receiver.get_code(timeout=1.0)
+    timer.join()
+    
+    assert code == "0xABC"
+
+
+def test_get_statistics(receiver):
+    """Test getting receiver statistics."""
+    receiver.codes_received = 5
+    receiver.codes_dropped = 2
+    receiver.code_queue.put_nowait("0x123")
+    
+    stats = receiver.get_statistics()
+    
+    assert stats["codes_received"] == 5
+    assert stats["codes_dropped"] == 2
+    assert stats["queue_size"] == 1
+    assert stats["connected"] is False  # Not connected in test
+    assert stats["receiving"] is False
+
+
+def test_send_command(receiver, serial_mock):
+    """Test sending command to Arduino."""
+    receiver.connect()
+    
+    receiver.send_command("S")
+    serial_mock.write.assert_called_once_with(b"S")
+
+
+def test_send_command_not_connected(receiver):
+    """Test sending command when not connected."""
+    # Should not raise exception
+    receiver.send_command("S")
+
+
+def test_send_command_exception(receiver, serial_mock):
+    """Test sending command with exception."""
+    serial_mock.write.side_effect = Exception("Write failed")
+    receiver.connect()
+    
+    # Should not raise exception
+    receiver.send_command("S")
+
+
+def test_is_connected_false(receiver):
+    """Test is_connected when not connected."""
+    assert receiver.is_connected() is False
+
+
+def test_is_connected_true(receiver, serial_mock):
+    """Test is_connected when connected."""
+    serial_mock.is_open = True
+    receiver.connect()
+    
+    assert receiver.is_connected() is True
+
+
+@pytest.mark.timeout(0.2)
+@pytest.mark.isolated
+def test_disconnect(receiver, serial_mock):
+    """Test disconnection."""
+    serial_mock.in_waiting = 0
+    receiver.serial_connection = serial_mock
+    receiver.start_receiving()
+    
+    receiver.disconnect()
+    
+    assert receiver.receiving is False
+    assert receiver.serial_connection is None
+    serial_mock.close.assert_called_once()
+
+
+def test_disconnect_not_connected(receiver):
+    """Test disconnection when not connected."""
+    receiver.code_queue.put_nowait("0x1")
+    
+    # Should not raise exception
+    receiver.disconnect()
+    
+    # Pending codes are still dropped
+    assert receiver.code_queue.empty()
+
+
+@pytest.mark.isolated
+def test_disconnect_close_exception(receiver, serial_mock):
+    """Test disconnection with close exception."""
+    serial_mock.close.side_effect = Exception("Close failed")
+    receiver.connect()
+    
+    # Should not raise exception
+    receiver.disconnect()
+    assert receiver.serial_connection is None
+
+
+def test_flush_buffer(receiver, serial_mock):
+    """Test buffer flushing."""
+    receiver.connect()
+    
+    # Add some items to queue
+    receiver.code_queue.put_nowait("0x1")
+    receiver.code_queue.put_nowait("0x2")
+    
+    receiver.flush_buffer()
+    
+    assert receiver.code_queue.empty()
+    serial_mock.reset_input_buffer.assert_called_once()
+
+
+def test_flush_buffer_not_connected(receiver):
+    """Test buffer flushing when not connected."""
+    # Add some items to queue
+    receiver.code_queue.put_nowait("0x1")
+    receiver.code_queue.put_nowait("0x2")
+    
+    receiver.flush_buffer()
+    
+    # Queue should still be cleared
+    assert receiver.code_queue.empty()
+
+
+@pytest.mark.timeout(0.2)
+@pytest.mark.isolated
+def test_receiver_loop_with_timeout_fixed(receiver, serial_mock, fake_time):
+    """Test receiver loop doesn't hang."""
+    # Idle polls skip the real sleep and report that the loop is spinning
+    polled = threading.Event()
+    fake_time(ir_receiver).sleep.side_effect = lambda seconds: polled.set()
+    
+    serial_mock.in_waiting = False
+    receiver.serial_connection = serial_mock
+    receiver.receiving = True
+    
+    thread = threading.Thread(target=receiver._receiver_loop, daemon=True)
+    thread.start()
+    
+    # Stop once the loop has polled at least once
+    assert polled.wait(timeout=0.05)
+    receiver.receiving = False
+    thread.join(timeout=0.05)
+    
+    # Thread should have stopped
+    assert not thread.is_alive()
+
+
+def test_process_line_sequence(receiver):
+    """Test the codes a serial read would produce, processed in order."""
+    for line in (b"0x123", b"0x456", b"REPEAT"):
+        receiver._process_line(line)
+    
+    assert receiver.codes_received == 3
+    assert [receiver.get_code() for _ in range(3)] == ["0x123", "0x456", "REPEAT"]
+
+
+@pytest.mark.parametrize("chunks,expected_lines,expected_remainder", [
+    ([b"0x123\n0x456\nREPEAT\n"], [b"0x123", b"0x456", b"REPEAT"], b""),
+    ([b"0x123\n0x4", b"56\r\nREP"], [b"0x123", b"0x456"], b"REP"),
+], ids=["one_chunk", "split_with_partial_trailer"])
+def test_consume_chunk(receiver, monkeypatch, chunks, expected_lines, expected_remainder):
+    """Test serial chunks are split into complete lines across reads."""
+    lines = []
+    monkeypatch.setattr(receiver, "_process_line", lines.append)
+    
+    buffer = b""
+    for chunk in chunks:
+        buffer = receiver._consume_chunk(buffer, chunk)
+    
+    assert lines == expected_lines
+    assert buffer == expected_remainder
+
+
+@pytest.mark.timeout(0.2)
+@pytest.mark.isolated
+def test_receiver_loop_integration(receiver, serial_mock):
+    """Test receiver thread turns one serial read into exactly three codes."""
+    data = b"0x123\n0x456\nREPEAT\n"
+    
+    serial_mock.read.side_effect = [data] + [b""] * 10
+    # in_waiting is read twice per chunk (the check and the read size)
+    type(serial_mock).in_waiting = PropertyMock(
+        side_effect=chain([len(data), len(data)], repeat(0))
+    )
+    receiver.serial_connection = serial_mock
+    
+    receiver.start_receiving()
+    # Each wait stays well under the 200 ms cap so a stall fails on the assert
+    codes = [receiver.get_code(timeout=0.05) for _ in range(3)]
+    receiver.stop_receiving()
+    
+    assert codes == ["0x123", "0x456", "REPEAT"]
+    assert receiver.codes_received == 3
+    serial_mock.read.assert_called_once_with(len(data))
 
 
 if __name__ == "__main__":
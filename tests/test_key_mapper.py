@@ -3,26 +3,106 @@ Test suite for key_mapper module.
 """
 
 import pytest
-import time
 import threading
+from types import SimpleNamespace
 from unittest.mock import Mock, MagicMock, patch
 
-from key_mapper import KeyMapper
 from config_manager import KeyMapping, ActionType
 
+# Shared, read-only mappings built once at import time
+SINGLE_A = KeyMapping(ActionType.SINGLE, "a", "Letter A")
+COMBO_CTRL_C = KeyMapping(ActionType.COMBO, ["ctrl", "c"], "Copy")
+SEQUENCE_AB = KeyMapping(ActionType.SEQUENCE, ["a", "b"], "Sequence")
+MAPPINGS_SINGLE = {"0x1": SINGLE_A}
+
+
+def recorder():
+    """Callable that records each call as an (args, kwargs) pair in .calls."""
+    calls = []
+    
+    def record(*args, **kwargs):
+        calls.append((args, kwargs))
+    
+    record.calls = calls
+    return record
+
+
+@pytest.fixture(scope="session")
+def km_module():
+    """key_mapper, imported on first use rather than at collection."""
+    import key_mapper
+    return key_mapper
+
+
+@pytest.fixture(scope="module")
+def mapper(km_module):
+    """One KeyMapper shared by the module; tests get it reset to defaults."""
+    m = km_module.KeyMapper()
+    m.debug = True  # Enable debug for testing
+    yield m
+    m.cleanup()
+
+
+@pytest.fixture(autouse=True)
+def kb(monkeypatch, km_module):
+    """Replace the keyboard calls with mocks for every test."""
+    ns = SimpleNamespace(
+        press=Mock(),
+        release=Mock(),
+        unhook_all=Mock(),
+        press_and_release=Mock(),
+    )
+    for name, mock in vars(ns).items():
+        monkeypatch.setattr(km_module.keyboard, name, mock)
+    return ns
+
+
+@pytest.fixture(autouse=True)
+def clock(fake_time, km_module):
+    """Frozen clock for key_mapper; advance it with clock.return_value += seconds."""
+    return fake_time(km_module, now=1000.0).time
+
+
+@pytest.fixture
+def fake_timer(monkeypatch, km_module):
+    """Stand-in for threading.Timer in key_mapper that never starts a thread."""
+    timer_cls = MagicMock(spec=threading.Timer)
+    timer_cls.return_value.is_alive.return_value = True
+    monkeypatch.setattr(km_module, "threading", SimpleNamespace(Timer=timer_cls))
+    return timer_cls
+
 
 class TestKeyMapper:
     """Test KeyMapper class."""
     
-    def setup_method(self):
-        """Set up test environment."""
-        self.mapper = KeyMapper()
-        self.mapper.debug = True  # Enable debug for testing
-    
-    def teardown_method(self):
-        """Clean up test environment."""
-        if self.mapper:
-            self.mapper.cleanup()
+    @pytest.fixture(autouse=True)
+    def _reset_mapper(self, mapper):
+        """Restore the shared mapper's state before each test; clean up after dirty ones."""
+        if isinstance(mapper.release_timer, threading.Timer):
+            mapper.release_timer.cancel()
+        mapper.release_timer = None
+        mapper.running = True
+        mapper.currently_pressed.clear()
+        mapper.last_code = None
+        mapper.last_mapping = None
+        mapper.last_code_time = 0
+        mapper.mappings = {}
+        mapper.stop_callback = None
+        mapper.status_callback = None
+        mapper.first_repeat_time = None
+        mapper.last_repeat_action_time = 0
+        mapper.repeat_started = False
+        mapper.ghost_key_enabled = False
+        mapper.single_tapping_enabled = False
+        mapper.repeat_enabled = True
+        self.mapper = mapper
+        
+        yield
+        
+        # Only tests that left keys held or a release timer pending need cleanup()
+        dirty = bool(mapper.currently_pressed) or mapper.release_timer is not None
+        if dirty:
+            mapper.cleanup()
     
     def test_init(self):
         """Test KeyMapper initialization."""
@@ -46,17 +126,14 @@ class TestKeyMapper:
     
     def test_set_mappings(self):
         """Test setting mappings."""
-        mappings = {
-            "0x1": KeyMapping(ActionType.SINGLE, "a", "Letter A"),
-            "0x2": KeyMapping(ActionType.COMBO, ["ctrl", "c"], "Copy")
-        }
+        mappings = {"0x1": SINGLE_A, "0x2": COMBO_CTRL_C}
         self.mapper.set_mappings(mappings)
         assert self.mapper.mappings == mappings
     
     def test_set_callbacks(self):
         """Test setting callbacks."""
-        stop_callback = Mock()
-        status_callback = Mock()
+        stop_callback = recorder()
+        status_callback = recorder()
         
         self.mapper.set_callbacks(stop_callback, status_callback)
         assert self.mapper.stop_callback == stop_callback
@@ -64,11 +141,11 @@ class TestKeyMapper:
     
     def test_log_with_callback(self):
         """Test logging with status callback."""
-        status_callback = Mock()
+        status_callback = recorder()
         self.mapper.set_callbacks(status_callback=status_callback)
         
         self.mapper._log("Test message")
-        status_callback.assert_called_once_with("Test message")
+        assert status_callback.calls == [(("Test message",), {})]
     
     def test_log_without_callback(self):
         """Test logging without callback."""
@@ -76,42 +153,41 @@ class TestKeyMapper:
             self.mapper._log("Test message")
             mock_print.assert_called_once_with("[Mapper] Test message")
     
-    @patch('keyboard.release')
-    @patch('keyboard.unhook_all')
-    def test_release_all(self, mock_unhook, mock_release):
+    def test_release_all(self, kb):
         """Test releasing all currently pressed keys."""
         self.mapper.currently_pressed = {"a", "ctrl"}
         self.mapper._release_all()
         
         assert len(self.mapper.currently_pressed) == 0
-        assert mock_release.call_count == 2
-        mock_unhook.assert_called_once()
+        assert kb.release.call_count == 2
+        kb.unhook_all.assert_called_once()
     
-    @patch('keyboard.release')
-    def test_release_all_with_exception(self, mock_release):
+    def test_release_all_with_exception(self, kb):
         """Test releasing keys with exception."""
-        mock_release.side_effect = Exception("Release failed")
+        kb.release.side_effect = Exception("Release failed")
         self.mapper.currently_pressed = {"a"}
         
         # Should not raise exception
         self.mapper._release_all()
         assert len(self.mapper.currently_pressed) == 0
     
-    def test_schedule_release(self):
+    def test_schedule_release(self, fake_timer):
         """Test scheduling automatic release."""
         self.mapper._schedule_release()
-        assert self.mapper.release_timer is not None
-        assert self.mapper.release_timer.is_alive()
         
-        # Cancel for cleanup
-        self.mapper.release_timer.cancel()
+        fake_timer.assert_called_once_with(
+            self.mapper.release_timeout, self.mapper._auto_release
+        )
+        assert self.mapper.release_timer is fake_timer.return_value
+        assert self.mapper.release_timer.daemon is True
+        self.mapper.release_timer.start.assert_called_once()
+        assert self.mapper.release_timer.is_alive()
     
-    @patch('keyboard.release')
-    @patch('keyboard.unhook_all')
-    def test_auto_release(self, mock_unhook, mock_release):
+    def test_auto_release(self, clock):
         """Test automatic release after timeout."""
         self.mapper.currently_pressed = {"a"}
-        self.mapper.last_code_time = time.time() - 1.0  # Old timestamp
+        self.mapper.last_code_time = clock.return_value
+        clock.return_value += 1.0  # Well past the release timeout
         
         self.mapper._auto_release()
         
@@ -119,11 +195,11 @@ class TestKeyMapper:
         assert self.mapper.last_code is None
         assert self.mapper.last_mapping is None
     
-    def test_reset_repeat_state(self):
+    def test_reset_repeat_state(self, clock):
         """Test resetting repeat state."""
-        self.mapper.first_repeat_time = time.time()
+        self.mapper.first_repeat_time = clock.return_value
         self.mapper.repeat_started = True
-        self.mapper.last_repeat_action_time = time.time()
+        self.mapper.last_repeat_action_time = clock.return_value
         self.mapper.last_code = "0x1"
         self.mapper.last_mapping = Mock()
         
@@ -146,28 +222,20 @@ class TestKeyMapper:
         result = self.mapper.process_code("0x999")
         assert result is False
     
-    @patch('keyboard.press')
-    def test_process_code_new_single_key(self, mock_press):
+    def test_process_code_new_single_key(self, kb):
         """Test processing new single key press."""
-        mappings = {
-            "0x1": KeyMapping(ActionType.SINGLE, "a", "Letter A")
-        }
-        self.mapper.set_mappings(mappings)
+        self.mapper.set_mappings(MAPPINGS_SINGLE)
         
         result = self.mapper.process_code("0x1")
         
         assert result is True
         assert self.mapper.last_code == "0x1"
         assert "a" in self.mapper.currently_pressed
-        mock_press.assert_called_once_with("a")
+        kb.press.assert_called_once_with("a")
     
-    @patch('keyboard.press')
-    def test_process_code_new_combo_key(self, mock_press):
+    def test_process_code_new_combo_key(self, kb):
         """Test processing new combo key press."""
-        mappings = {
-            "0x1": KeyMapping(ActionType.COMBO, ["ctrl", "c"], "Copy")
-        }
-        self.mapper.set_mappings(mappings)
+        self.mapper.set_mappings({"0x1": COMBO_CTRL_C})
         
         result = self.mapper.process_code("0x1")
         
@@ -175,272 +243,176 @@ class TestKeyMapper:
         assert self.mapper.last_code == "0x1"
         assert "ctrl" in self.mapper.currently_pressed
         assert "c" in self.mapper.currently_pressed
-        assert mock_press.call_count == 2
+        assert kb.press.call_count == 2
     
-    @patch('keyboard.press_and_release')
-    def test_process_code_sequence(self, mock_press_release):
+    def test_process_code_sequence(self, kb):
         """Test processing sequence action."""
-        mappings = {
-            "0x1": KeyMapping(ActionType.SEQUENCE, ["a", "b"], "Sequence")
-        }
-        self.mapper.set_mappings(mappings)
+        self.mapper.set_mappings({"0x1": SEQUENCE_AB})
         
         result = self.mapper.process_code("0x1")
         
         assert result is True
-        assert mock_press_release.call_count == 2
-    
-    def test_process_code_special_stop(self):
-        """Test processing special stop action."""
-        stop_callback = Mock()
+        assert kb.press_and_release.call_count == 2
+    
+    @pytest.mark.parametrize("target,attr,expect", [
+        ("stop", None, True),
+        ("toggle_ghost", "ghost_key_enabled", True),
+        ("toggle_tap", "single_tapping_enabled", True),
+        ("toggle_repeat", "repeat_enabled", True),
+        ("unknown", None, False),
+    ], ids=["stop", "toggle_ghost", "toggle_tap", "toggle_repeat", "unknown"])
+    def test_process_code_special(self, target, attr, expect):
+        """Test processing special actions."""
+        stop_callback = recorder()
         self.mapper.set_callbacks(stop_callback=stop_callback)
         
         mappings = {
-            "0x1": KeyMapping(ActionType.SPECIAL, "stop", "Stop")
-        }
-        self.mapper.set_mappings(mappings)
-        
-        result = self.mapper.process_code("0x1")
-        
-        assert result is True
-        stop_callback.assert_called_once()
-    
-    def test_process_code_special_toggle_ghost(self):
-        """Test processing toggle ghost special action."""
-        mappings = {
-            "0x1": KeyMapping(ActionType.SPECIAL, "toggle_ghost", "Toggle Ghost")
+            "0x1": KeyMapping(ActionType.SPECIAL, target, target)
         }
         self.mapper.set_mappings(mappings)
         
-        initial_state = self.mapper.ghost_key_enabled
+        initial_state = getattr(self.mapper, attr) if attr else None
         result = self.mapper.process_code("0x1")
         
-        assert result is True
-        assert self.mapper.ghost_key_enabled != initial_state
-    
-    def test_process_code_special_toggle_tap(self):
-        """Test processing toggle tap special action."""
-        mappings = {
-            "0x1": KeyMapping(ActionType.SPECIAL, "toggle_tap", "Toggle Tap")
-        }
-        self.mapper.set_mappings(mappings)
-        
-        initial_state = self.mapper.single_tapping_enabled
-        result = self.mapper.process_code("0x1")
-        
-        assert result is True
-        assert self.mapper.single_tapping_enabled != initial_state
-    
-    def test_process_code_special_toggle_repeat(self):
-        """Test processing toggle repeat special action."""
-        mappings = {
-            "0x1": KeyMapping(ActionType.SPECIAL, "toggle_repeat", "Toggle Repeat")
-        }
-        self.mapper.set_mappings(mappings)
-        
-        initial_state = self.mapper.repeat_enabled
-        result = self.mapper.process_code("0x1")
-        
-        assert result is True
-        assert self.mapper.repeat_enabled != initial_state
-    
-    def test_process_code_special_unknown(self):
-        """Test processing unknown special action."""
-        mappings = {
-            "0x1": KeyMapping(ActionType.SPECIAL, "unknown", "Unknown")
-        }
-        self.mapper.set_mappings(mappings)
-        
-        result = self.mapper.process_code("0x1")
-        assert result is False
-    
-    @patch('keyboard.press')
-    def test_process_code_bounce_protection(self, mock_press):
-        """Test bounce protection for repeated codes."""
-        mappings = {
-            "0x1": KeyMapping(ActionType.SINGLE, "a", "Letter A")
-        }
-        self.mapper.set_mappings(mappings)
-        
-        # First press
-        result1 = self.mapper.process_code("0x1")
-        assert result1 is True
-        
-        # Immediate repeat (should be bounced)
-        result2 = self.mapper.process_code("0x1")
-        assert result2 is False
-        
-        # Only one press should have occurred
-        mock_press.assert_called_once()
-    
-    @patch('keyboard.press')
-    def test_process_code_after_timeout(self, mock_press):
-        """Test processing code after timeout."""
-        mappings = {
-            "0x1": KeyMapping(ActionType.SINGLE, "a", "Letter A")
-        }
-        self.mapper.set_mappings(mappings)
+        assert result is expect
+        if attr is None:
+            assert len(stop_callback.calls) == (1 if expect else 0)
+        else:
+            assert getattr(self.mapper, attr) != initial_state
+            assert stop_callback.calls == []
+    
+    @pytest.mark.parametrize("delta,expected_second,total_presses", [
+        (0.0, False, 1),
+        (1.0, True, 2),
+    ], ids=["bounce", "after_timeout"])
+    def test_process_code_second_press(self, kb, clock, delta, expected_second, total_presses):
+        """Test a repeated code is bounced inside the timeout and pressed again after it."""
+        self.mapper.set_mappings(MAPPINGS_SINGLE)
         
         # First press
-        result1 = self.mapper.process_code("0x1")
-        assert result1 is True
-        
-        # Simulate timeout
-        self.mapper.last_code_time = time.time() - 1.0
+        assert self.mapper.process_code("0x1") is True
         
-        # Should work again
-        result2 = self.mapper.process_code("0x1")
-        assert result2 is True
+        clock.return_value += delta
         
-        assert mock_press.call_count == 2
+        assert self.mapper.process_code("0x1") is expected_second
+        assert kb.press.call_count == total_presses
     
-    def test_handle_repeat_no_last_code(self):
+    def test_handle_repeat_no_last_code(self, clock):
         """Test handling repeat with no last code."""
-        result = self.mapper._handle_repeat(time.time())
+        result = self.mapper._handle_repeat(clock.return_value)
         assert result is False
     
-    def test_handle_repeat_first_time(self):
+    def test_handle_repeat_first_time(self, clock):
         """Test handling first repeat signal."""
-        mappings = {
-            "0x1": KeyMapping(ActionType.SINGLE, "a", "Letter A")
-        }
-        self.mapper.set_mappings(mappings)
+        self.mapper.set_mappings(MAPPINGS_SINGLE)
         self.mapper.last_code = "0x1"
-        self.mapper.last_mapping = mappings["0x1"]
+        self.mapper.last_mapping = SINGLE_A
         
-        current_time = time.time()
+        current_time = clock.return_value
         result = self.mapper._handle_repeat(current_time)
         
         assert result is True
         assert self.mapper.first_repeat_time == current_time
         assert self.mapper.repeat_started is False
     
-    @patch('keyboard.release')
-    @patch('keyboard.press')
-    def test_handle_repeat_after_delay(self, mock_press, mock_release):
+    def test_handle_repeat_after_delay(self, kb, clock):
         """Test handling repeat after initial delay."""
-        mappings = {
-            "0x1": KeyMapping(ActionType.SINGLE, "a", "Letter A")
-        }
-        self.mapper.set_mappings(mappings)
+        self.mapper.set_mappings(MAPPINGS_SINGLE)
         self.mapper.last_code = "0x1"
-        self.mapper.last_mapping = mappings["0x1"]
-        self.mapper.first_repeat_time = time.time() - 0.5  # Past delay threshold
+        self.mapper.last_mapping = SINGLE_A
+        self.mapper.first_repeat_time = clock.return_value
+        clock.return_value += 0.5  # Past delay threshold
         
-        result = self.mapper._handle_repeat(time.time())
+        result = self.mapper._handle_repeat(clock.return_value)
         
         assert result is True
         assert self.mapper.repeat_started is True
-        mock_release.assert_called_once_with("a")
-        mock_press.assert_called_once_with("a")
+        kb.release.assert_called_once_with("a")
+        kb.press.assert_called_once_with("a")
     
-    def test_handle_repeat_disabled(self):
+    def test_handle_repeat_disabled(self, clock):
         """Test handling repeat when repeat is disabled."""
-        mappings = {
-            "0x1": KeyMapping(ActionType.SINGLE, "a", "Letter A")
-        }
-        self.mapper.set_mappings(mappings)
+        self.mapper.set_mappings(MAPPINGS_SINGLE)
         self.mapper.last_code = "0x1"
-        self.mapper.last_mapping = mappings["0x1"]
+        self.mapper.last_mapping = SINGLE_A
         self.mapper.repeat_enabled = False
         
-        result = self.mapper._handle_repeat(time.time())
+        result = self.mapper._handle_repeat(clock.return_value)
         assert result is True
         assert self.mapper.first_repeat_time is None
     
-    @patch('keyboard.press_and_release')
-    def test_execute_tap_single(self, mock_press_release):
-        """Test executing tap for single key."""
-        mapping = KeyMapping(ActionType.SINGLE, "a", "Letter A")
-        self.mapper._execute_tap(mapping)
-        mock_press_release.assert_called_once_with("a")
-    
-    @patch('keyboard.press_and_release')
-    def test_execute_tap_combo_list(self, mock_press_release):
-        """Test executing tap for combo with list."""
-        mapping = KeyMapping(ActionType.COMBO, ["ctrl", "c"], "Copy")
-        self.mapper._execute_tap(mapping)
-        mock_press_release.assert_called_once_with("ctrl+c")
-    
-    @patch('keyboard.press_and_release')
-    def test_execute_tap_combo_string(self, mock_press_release):
-        """Test executing tap for combo with string."""
-        mapping = KeyMapping(ActionType.COMBO, "ctrl", "Ctrl")
-        self.mapper._execute_tap(mapping)
-        mock_press_release.assert_called_once_with("ctrl")
-    
-    @patch('keyboard.press_and_release')
-    def test_execute_sequence_list(self, mock_press_release):
-        """Test executing sequence with list."""
-        mapping = KeyMapping(ActionType.SEQUENCE, ["a", "b"], "Sequence")
-        self.mapper._execute_sequence(mapping)
-        assert mock_press_release.call_count == 2
-    
-    @patch('keyboard.press_and_release')
-    def test_execute_sequence_string(self, mock_press_release):
-        """Test executing sequence with string."""
-        mapping = KeyMapping(ActionType.SEQUENCE, "a", "Single")
-        self.mapper._execute_sequence(mapping)
-        mock_press_release.assert_called_once_with("a")
-    
-    @patch('keyboard.press')
-    def test_execute_initial_press_single_tap_mode(self, mock_press):
+    @pytest.mark.parametrize("atype,data,expected", [
+        (ActionType.SINGLE, "a", ["a"]),
+        (ActionType.COMBO, ["ctrl", "c"], ["ctrl+c"]),
+        (ActionType.COMBO, "ctrl", ["ctrl"]),
+    ], ids=["single", "combo_list", "combo_string"])
+    def test_execute_tap(self, kb, atype, data, expected):
+        """Test executing tap for each key shape."""
+        self.mapper._execute_tap(KeyMapping(atype, data, ""))
+        assert [c.args[0] for c in kb.press_and_release.call_args_list] == expected
+    
+    @pytest.mark.parametrize("data,expected", [
+        (["a", "b"], ["a", "b"]),
+        ("a", ["a"]),
+    ], ids=["list", "string"])
+    def test_execute_sequence(self, kb, data, expected):
+        """Test executing sequence with list or string keys."""
+        self.mapper._execute_sequence(KeyMapping(ActionType.SEQUENCE, data, ""))
+        assert [c.args[0] for c in kb.press_and_release.call_args_list] == expected
+    
+    def test_execute_initial_press_single_tap_mode(self, kb):
         """Test executing initial press in single tap mode."""
         self.mapper.single_tapping_enabled = True
-        mapping = KeyMapping(ActionType.SINGLE, "a", "Letter A")
+        mapping = SINGLE_A
         
         with patch.object(self.mapper, '_execute_tap') as mock_tap:
             self.mapper._execute_initial_press(mapping)
             mock_tap.assert_called_once_with(mapping)
-            mock_press.assert_not_called()
+            kb.press.assert_not_called()
     
-    @patch('keyboard.press')
-    def test_execute_initial_press_exception(self, mock_press):
+    def test_execute_initial_press_exception(self, kb):
         """Test executing initial press with exception."""
-        mock_press.side_effect = Exception("Press failed")
-        mapping = KeyMapping(ActionType.SINGLE, "a", "Letter A")
+        kb.press.side_effect = Exception("Press failed")
+        mapping = SINGLE_A
         
         # Should not raise exception
         self.mapper._execute_initial_press(mapping)
     
-    @patch('keyboard.release')
-    @patch('keyboard.press')
-    def test_execute_repeat_action_single_tap_mode(self, mock_press, mock_release):
+    def test_execute_repeat_action_single_tap_mode(self, kb):
         """Test executing repeat action in single tap mode."""
         self.mapper.single_tapping_enabled = True
-        mapping = KeyMapping(ActionType.SINGLE, "a", "Letter A")
+        mapping = SINGLE_A
         
         with patch.object(self.mapper, '_execute_tap') as mock_tap:
             self.mapper._execute_repeat_action(mapping)
             mock_tap.assert_called_once_with(mapping)
-            mock_press.assert_not_called()
-            mock_release.assert_not_called()
+            kb.press.assert_not_called()
+            kb.release.assert_not_called()
     
-    @patch('keyboard.release')
-    @patch('keyboard.press')
-    def test_execute_repeat_action_exception(self, mock_press, mock_release):
+    def test_execute_repeat_action_exception(self, kb):
         """Test executing repeat action with exception."""
-        mock_release.side_effect = Exception("Release failed")
-        mapping = KeyMapping(ActionType.SINGLE, "a", "Letter A")
+        kb.release.side_effect = Exception("Release failed")
+        mapping = SINGLE_A
         
         # Should not raise exception
         self.mapper._execute_repeat_action(mapping)
     
-    def test_cleanup(self):
+    def test_cleanup(self, clock, monkeypatch):
         """Test cleanup method."""
-        self.mapper.release_timer = Mock()
-        self.mapper.first_repeat_time = time.time()
+        self.mapper.release_timer = SimpleNamespace(cancel=recorder())
+        self.mapper.first_repeat_time = clock.return_value
         self.mapper.repeat_started = True
         self.mapper.last_code = "0x1"
+        release_all = recorder()
+        monkeypatch.setattr(self.mapper, "_release_all", release_all)
         
-        with patch.object(self.mapper, '_release_all') as mock_release:
-            self.mapper.cleanup()
-            
-            self.mapper.release_timer.cancel.assert_called_once()
-            assert self.mapper.first_repeat_time is None
-            assert self.mapper.repeat_started is False
-            assert self.mapper.last_code is None
-            mock_release.assert_called_once()
+        self.mapper.cleanup()
+        
+        assert len(self.mapper.release_timer.cancel.calls) == 1
+        assert self.mapper.first_repeat_time is None
+        assert self.mapper.repeat_started is False
+        assert self.mapper.last_code is None
+        assert len(release_all.calls) == 1
     
     def test_cleanup_no_timer(self):
         """Test cleanup with no active timer."""
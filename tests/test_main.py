@@ -2,21 +2,15 @@
 Tests for the main module.
 """
 
-import pytest
-import sys
-from unittest.mock import Mock, patch
+import importlib.util
 from pathlib import Path
 
-# Add src to path for imports
-src_path = Path(__file__).parent.parent / "src"
-sys.path.insert(0, str(src_path))
-
 
 class TestMain:
     """Test cases for main module."""
 
     def test_main_module_exists(self):
-        """Test that main module can be imported."""
-        import main
-        assert hasattr(main, 'main')
-        assert callable(main.main)
\ No newline at end of file
+        """Test that main module can be found on the src path."""
+        spec = importlib.util.find_spec("main")
+        assert spec is not None
+        assert Path(spec.origin).parent.name == "src"
@@ -3,95 +3,146 @@ Test suite for main_controller module.
 """
 
 import pytest
-import json
-import tempfile
-import time
 import signal
-import threading
-from pathlib import Path
-from unittest.mock import Mock, MagicMock, patch, mock_open
-import sys
+from types import SimpleNamespace
+from unittest.mock import DEFAULT, Mock, patch
 
-# Add parent directory for imports
-sys.path.insert(0, str(Path(__file__).parent.parent))
+# Defaults for the per-test instance mocks, built once
+_RECEIVER_DEFAULTS = {
+    "connect.return_value": True,
+    "start_receiving.return_value": True,
+    "is_connected.return_value": True,
+    "get_code.return_value": None,
+}
+# Instance attributes read by get_status; not visible on the class
+_MAPPER_DEFAULTS = {"ghost_key_enabled": False, "single_tapping_enabled": False}
 
-try:
-    from main_controller import IRRemoteController
-    from config_manager import KeyMapping, ActionType
-except ImportError as e:
-    pytest.skip(f"Cannot import modules: {e}", allow_module_level=True)
+_EXPECTED_STATUS_COMPLETE = {
+    "running": True,
+    "connected": True,
+    "profile": "Test Profile",
+    "ghost_key_enabled": True,
+    "single_tap_enabled": False,
+}
+# Two IR codes followed by idle polls
+_CODES_FIXTURE = ("0x1", "0x2", None, None)
+
+
+@pytest.fixture(scope="module")
+def instance_specs(controller_class):
+    """Attribute-name specs for the controller's dependencies, built once per module."""
+    import main_controller
+    return SimpleNamespace(
+        config=dir(main_controller.ConfigManager),
+        receiver=dir(main_controller.IRReceiver),
+        mapper=dir(main_controller.KeyMapper),
+    )
+
+
+@pytest.fixture(scope="module")
+def controller_classes(instance_specs):
+    """Mock ConfigManager, IRReceiver and KeyMapper classes, patched in once per module."""
+    with patch.multiple(
+        "main_controller",
+        new_callable=Mock,
+        ConfigManager=DEFAULT,
+        IRReceiver=DEFAULT,
+        KeyMapper=DEFAULT,
+    ) as mocks:
+        yield SimpleNamespace(
+            config=mocks["ConfigManager"],
+            receiver=mocks["IRReceiver"],
+            mapper=mocks["KeyMapper"],
+        )
+
+
+@pytest.fixture
+def controller_mocks(controller_classes, instance_specs):
+    """The module's mock classes, returning fresh instances built from the cached prototypes."""
+    for mock_class in vars(controller_classes).values():
+        mock_class.reset_mock()
+    
+    controller_classes.config.return_value = Mock(spec=instance_specs.config)
+    controller_classes.receiver.return_value = Mock(spec=instance_specs.receiver, **_RECEIVER_DEFAULTS)
+    controller_classes.mapper.return_value = Mock(spec=instance_specs.mapper, **_MAPPER_DEFAULTS)
+    return controller_classes
+
+
+@pytest.fixture
+def controller_time(fake_time, controller_class):
+    """Frozen clock for main_controller with a mocked, non-blocking sleep."""
+    import main_controller
+    return fake_time(main_controller)
+
+
+@pytest.fixture(scope="class")
+def shared_controller(controller_class, controller_classes):
+    """One controller per test class; its dependencies are swapped in per test."""
+    return controller_class(port="TEST_PORT")
 
 
 class TestIRRemoteController:
     """IRRemoteController tests with timeout protection."""
     
     @pytest.fixture(autouse=True)
-    def setup_method(self):
+    def setup_method(self, controller_class, controller_mocks, shared_controller):
         """Set up test environment with proper mocking."""
-        self.temp_dir = tempfile.mkdtemp()
-        
-        # Patch all imports at class level
-        self.config_patcher = patch('main_controller.ConfigManager')
-        self.receiver_patcher = patch('main_controller.IRReceiver')
-        self.mapper_patcher = patch('main_controller.KeyMapper')
+        self.controller_cls = controller_class
         
-        self.mock_config_class = self.config_patcher.start()
-        self.mock_receiver_class = self.receiver_patcher.start()
-        self.mock_mapper_class = self.mapper_patcher.start()
+        self.mock_config_class = controller_mocks.config
+        self.mock_receiver_class = controller_mocks.receiver
+        self.mock_mapper_class = controller_mocks.mapper
         
         # Setup return values
         self.mock_config = self.mock_config_class.return_value
         self.mock_receiver = self.mock_receiver_class.return_value
         self.mock_mapper = self.mock_mapper_class.return_value
         
-        # Configure mocks
-        self.mock_receiver.connect.return_value = True
-        self.mock_receiver.start_receiving.return_value = True
-        self.mock_receiver.is_connected.return_value = True
-        self.mock_receiver.get_code.return_value = None
-        
-        # Create controller
-        self.controller = IRRemoteController(port="TEST_PORT")
+        # Reset the shared controller onto this test's mocks
+        self.controller = shared_controller
+        self.controller.running = False
+        self.controller.current_profile = None
+        self.controller.config_manager = self.mock_config
+        self.controller.receiver = self.mock_receiver
+        self.controller.mapper = self.mock_mapper
         
         yield
         
         # Cleanup
-        self.config_patcher.stop()
-        self.receiver_patcher.stop()
-        self.mapper_patcher.stop()
-        
-        if hasattr(self, 'controller'):
-            self.controller.stop()
+        try:
+            if self.controller is not None:
+                self.controller.stop()
+        finally:
+            # pytest keeps test instances alive for the session; drop the mock trees
+            for mock in (self.mock_config, self.mock_receiver, self.mock_mapper):
+                mock.reset_mock()
+            self.controller = None
+            self.controller_cls = None
+            self.mock_config = None
+            self.mock_receiver = None
+            self.mock_mapper = None
+            self.mock_config_class = None
+            self.mock_receiver_class = None
+            self.mock_mapper_class = None
     
     def test_init_default_port(self):
         """Test initialization with default port."""
-        with patch('main_controller.ConfigManager'):
-            with patch('main_controller.IRReceiver') as mock_receiver:
-                with patch('main_controller.KeyMapper'):
-                    controller = IRRemoteController()
-                    mock_receiver.assert_called_once_with(port="COM4")
+        controller = self.controller_cls()
+        self.mock_receiver_class.assert_called_with(port="COM4")
     
     def test_init_custom_port(self):
         """Test initialization with custom port."""
-        # This is already tested in setup, verify the mock was called correctly
+        controller = self.controller_cls(port="TEST_PORT")
         self.mock_receiver_class.assert_called_with(port="TEST_PORT")
     
-    @patch('builtins.open', mock_open(read_data='{"mappings": {"0x1": {"action_type": "single", "keys": "a"}}}'))
-    def test_load_profile_from_file(self):
-        """Test loading profile from file."""
-        # This should not timeout
-        with patch('json.load') as mock_json_load:
-            mock_json_load.return_value = {
-                "mappings": {
-                    "0x1": {"action_type": "single", "keys": "a"}
-                }
-            }
-            
-            # This should complete quickly
-            self.controller.load_profile("test.json")
-            
-            # Verify the mapper was configured
-            self.mock_mapper.set_mappings.assert_called()
+    def test_load_profile_missing_skips_mapper(self):
+        """Test that a profile that fails to load leaves the mapper untouched."""
+        self.mock_config.load_profile.return_value = None
+        
+        assert self.controller.load_profile("test.json") is False
+        
+        self.mock_mapper.set_mappings.assert_not_called()
+        self.mock_config.set_setting.assert_not_called()
     
     def test_signal_handler_no_actual_exit(self):
         """Test signal handler without actual system exit."""
@@ -101,103 +152,54 @@ class TestIRRemoteController:
                 mock_stop.assert_called_once()
                 mock_exit.assert_called_once_with(0)
     
-    def test_start_success(self):
-        """Test successful controller start."""
-        self.mock_receiver.connect.return_value = True
-        self.mock_receiver.start_receiving.return_value = True
+    @pytest.mark.parametrize("connect_ok,recv_ok,expected", [
+        (True, True, True),
+        (False, True, False),
+        (True, False, False),
+    ], ids=["success", "connect_failure", "receiving_failure"])
+    def test_start(self, connect_ok, recv_ok, expected):
+        """Test controller start for each receiver outcome."""
+        self.mock_receiver.connect.return_value = connect_ok
+        self.mock_receiver.start_receiving.return_value = recv_ok
         
         result = self.controller.start()
         
-        assert result is True
-        assert self.controller.running is True
+        assert result is expected
+        assert self.controller.running is expected
         self.mock_receiver.connect.assert_called_once()
-        self.mock_receiver.start_receiving.assert_called_once()
-    
-    def test_start_connect_failure(self):
-        """Test controller start with connection failure."""
-        self.mock_receiver.connect.return_value = False
-        
-        with patch('builtins.print'):
-            result = self.controller.start()
-            
-            assert result is False
-            assert self.controller.running is False
+        assert self.mock_receiver.start_receiving.call_count == (1 if connect_ok else 0)
     
-    def test_start_receiving_failure(self):
-        """Test controller start with receiving failure."""
-        self.mock_receiver.connect.return_value = True
-        self.mock_receiver.start_receiving.return_value = False
-        
-        with patch('builtins.print'):
-            result = self.controller.start()
-            
-            assert result is False
-            assert self.controller.running is False
-    
-    def test_run_not_running(self):
+    def test_run_not_running(self, controller_time):
         """Test run method when controller is not running."""
         self.controller.running = False
         
         # Should return immediately without calling get_code
-        start_time = time.time()
         self.controller.run()
-        duration = time.time() - start_time
         
-        # Should complete almost instantly
-        assert duration < 0.1
         self.mock_receiver.get_code.assert_not_called()
+        controller_time.sleep.assert_not_called()
     
-    def test_run_with_limited_iterations(self):
-        """Test run method with controlled iteration count."""
-        self.controller.running = True
-        
-        # Mock get_code to return None a few times then stop the controller
-        call_count = 0
-        def mock_get_code():
-            nonlocal call_count
-            call_count += 1
-            if call_count >= 3:  # Stop after 3 calls
-                self.controller.running = False
-            return None
-        
-        self.mock_receiver.get_code.side_effect = mock_get_code
-        
-        start_time = time.time()
-        self.controller.run()
-        duration = time.time() - start_time
-        
-        # Should complete quickly
-        assert duration < 1.0
-        assert call_count == 3
-    
-    def test_run_with_ir_codes_limited(self):
-        """Test run method processing IR codes with limited iterations."""
+    @pytest.mark.parametrize("codes,expected_processed", [
+        ([None, None, None], 0),
+        (_CODES_FIXTURE, 2),
+    ], ids=["idle", "ir_codes"])
+    def test_run_with_limited_iterations(self, controller_time, codes, expected_processed):
+        """Test run method over a fixed sequence of codes, stopping after the last."""
         self.controller.running = True
         
-        # Mock a sequence of codes then stop
-        codes = ["0x1", "0x2", None, None]
-        call_count = 0
-        
-        def mock_get_code():
-            nonlocal call_count
-            if call_count < len(codes):
-                code = codes[call_count]
-                call_count += 1
-                if call_count >= len(codes):
-                    self.controller.running = False
-                return code
-            return None
+        def codes_then_stop():
+            yield from codes[:-1]
+            self.controller.running = False
+            yield codes[-1]
         
-        self.mock_receiver.get_code.side_effect = mock_get_code
+        self.mock_receiver.get_code.side_effect = codes_then_stop()
         
-        start_time = time.time()
         self.controller.run()
-        duration = time.time() - start_time
         
-        # Should complete quickly
-        assert duration < 1.0
-        # Should have processed the IR codes
-        assert self.mock_mapper.process_code.call_count == 2
+        assert self.mock_receiver.get_code.call_count == len(codes)
+        assert self.mock_mapper.process_code.call_count == expected_processed
+        # Every idle poll yields once
+        assert controller_time.sleep.call_count == codes.count(None)
     
     def test_run_with_keyboard_interrupt(self):
         """Test run method handles KeyboardInterrupt properly."""
@@ -211,17 +213,17 @@ class TestIRRemoteController:
             self.controller.run()
             mock_stop.assert_called_once()
     
-    def test_stop(self):
+    def test_stop(self, capsys):
         """Test stopping the controller."""
         self.controller.running = True
         
-        with patch('builtins.print'):
-            self.controller.stop()
-            
-            assert self.controller.running is False
-            self.mock_receiver.disconnect.assert_called_once()
-            self.mock_mapper.disable.assert_called_once()
-            self.mock_mapper.cleanup.assert_called_once()
+        self.controller.stop()
+        
+        assert self.controller.running is False
+        self.mock_receiver.disconnect.assert_called_once()
+        self.mock_mapper.disable.assert_called_once()
+        self.mock_mapper.cleanup.assert_called_once()
+        assert capsys.readouterr().out == "Controller stopped\n"
     
     def test_list_available_profiles(self):
         """Test listing available profiles."""
@@ -244,14 +246,7 @@ class TestIRRemoteController:
         
         status = self.controller.get_status()
         
-        expected_status = {
-            "running": True,
-            "connected": True,
-            "profile": "Test Profile",
-            "ghost_key_enabled": True,
-            "single_tap_enabled": False,
-        }
-        assert status == expected_status
+        assert status == _EXPECTED_STATUS_COMPLETE
     
     def test_get_status_no_profile(self):
         """Test getting status with no active profile."""
@@ -265,9 +260,10 @@ class TestIRRemoteController:
         assert status["running"] is False
         assert status["connected"] is False
     
-    def test_get_status_no_receiver(self):
+    def test_get_status_no_receiver(self, monkeypatch):
         """Test getting status with no receiver."""
-        self.controller.receiver = None
+        # Restored before teardown stops the shared controller
+        monkeypatch.setattr(self.controller, "receiver", None)
         
         status = self.controller.get_status()
         
@@ -298,84 +294,61 @@ class TestIRRemoteController:
         assert result is False
         self.mock_config.load_profile.assert_called_once_with("invalid.json")
     
-    def test_log_message(self):
+    def test_log_message(self, capsys):
         """Test log message method."""
         with patch('time.strftime', return_value="12:34:56"):
-            with patch('builtins.print') as mock_print:
-                self.controller._log_message("Test message")
-                mock_print.assert_called_once_with("[12:34:56] Test message")
+            self.controller._log_message("Test message")
+        
+        assert capsys.readouterr().out == "[12:34:56] Test message\n"
     
-    def test_run_timeout_protection(self):
-        """Test that run method has built-in timeout protection."""
+    def test_run_timeout_protection(self, controller_time):
+        """Test that the idle run loop yields to sleep and exits once stopped."""
         self.controller.running = True
         
         # Set up a scenario that could potentially run forever
         self.mock_receiver.get_code.return_value = None
         
-        # Start run in a separate thread with timeout
-        import threading
+        # The first idle sleep stops the controller
+        def stop_running(seconds):
+            self.controller.running = False
         
-        def run_with_timeout():
-            self.controller.run()
+        controller_time.sleep.side_effect = stop_running
         
-        thread = threading.Thread(target=run_with_timeout, daemon=True)
-        start_time = time.time()
-        thread.start()
-        
-        # Let it run for a short time, then force stop
-        time.sleep(0.1)
-        self.controller.running = False
-        
-        # Wait for thread to complete
-        thread.join(timeout=1.0)
-        duration = time.time() - start_time
+        self.controller.run()
         
-        # Should not have taken too long
-        assert duration < 2.0
-        assert not thread.is_alive()
+        assert self.controller.running is False
+        assert self.mock_receiver.get_code.called
 
 
+@pytest.mark.controller_integration
 class TestIRRemoteControllerIntegration:
     """Integration tests that are timeout-safe."""
     
-    def test_full_workflow_quick(self):
+    def test_full_workflow_quick(self, controller_class, controller_mocks):
         """Test complete workflow with timeout protection."""
-        with patch('main_controller.ConfigManager') as mock_config_class:
-            with patch('main_controller.IRReceiver') as mock_receiver_class:
-                with patch('main_controller.KeyMapper') as mock_mapper_class:
-                    
-                    # Setup mocks
-                    mock_receiver = mock_receiver_class.return_value
-                    mock_mapper = mock_mapper_class.return_value
-                    mock_config = mock_config_class.return_value
-                    
-                    mock_receiver.connect.return_value = True
-                    mock_receiver.start_receiving.return_value = True
-                    mock_receiver.is_connected.return_value = True
-                    mock_receiver.get_code.return_value = None
-                    
-                    mock_config.list_profiles.return_value = ["test.json"]
-                    
-                    mock_profile = Mock()
-                    mock_profile.name = "Test Profile"
-                    mock_profile.mappings = {}
-                    mock_config.load_profile.return_value = mock_profile
-                    
-                    # Create and test controller
-                    controller = IRRemoteController(port="TEST_PORT")
-                    
-                    # Test workflow without running the main loop
-                    assert controller.start() is True
-                    assert controller.load_profile("test.json") is True
-                    assert controller.list_available_profiles() == ["test.json"]
-                    
-                    status = controller.get_status()
-                    assert status["running"] is True
-                    assert status["connected"] is True
-                    assert status["profile"] == "Test Profile"
-                    
-                    controller.stop()
-                    assert controller.running is False
+        mock_config = controller_mocks.config.return_value
+        mock_config.list_profiles.return_value = ["test.json"]
+        
+        mock_profile = Mock()
+        mock_profile.name = "Test Profile"
+        mock_profile.mappings = {}
+        mock_config.load_profile.return_value = mock_profile
+        
+        # Create and test controller
+        controller = controller_class(port="TEST_PORT")
+        
+        # Test workflow without running the main loop
+        assert controller.start() is True
+        assert controller.load_profile("test.json") is True
+        assert controller.list_available_profiles() == ["test.json"]
+        
+        status = controller.get_status()
+        assert status["running"] is True
+        assert status["connected"] is True
+        assert status["profile"] == "Test Profile"
+        
+        controller.stop()
+        assert controller.running is False
 
 
 if __name__ == "__main__":